@@ -3,7 +3,12 @@ import os
 import sys
 import argparse
 import fnmatch
+import functools
 import json
+import re
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 
 # optional YAML support
 try:
@@ -18,9 +23,39 @@ MEDIA_EXTENSIONS = {
     'mp4', 'mov', 'avi', 'mkv', 'flv', 'wmv', 'webm'
 }
 
+# Directories that are never exported, checked by name like '.git/' in a .gitignore
+ALWAYS_IGNORED_DIRS = {'.git'}
+
+# Gitignore patterns compiled once per run. Patterns without a leading or
+# inner '/' match an entry's name at any depth: '*.ext' suffixes, literal
+# names and directory names, plus combined regexes for the globs. Anchored
+# patterns match the path from the root: literal directory prefixes, a
+# regex for wildcard directory patterns and a regex for everything else.
+IgnoreRules = namedtuple('IgnoreRules',
+                         ['exts', 'names', 'name_match', 'dir_names', 'dir_name_match',
+                          'dir_prefixes', 'dir_match', 'match'])
+
+# Patterns like '*.log' that reduce to a set lookup on the extension
+SIMPLE_EXT_PATTERN = re.compile(r'\*\.([A-Za-z0-9_]+)')
+
+# Buffer size for streaming file contents and for the output stream
+COPY_BUFSIZE = 1024 * 1024
+
+# Files below this size are read in one os.read call instead of through open()
+SMALL_FILE_SIZE = 64 * 1024
+READ_FLAGS = os.O_RDONLY | getattr(os, 'O_BINARY', 0)
+
+# Bytes checked for a NUL byte to spot binary files without decoding them
+BINARY_SNIFF_SIZE = 8192
+
+# Maximum number of file reads queued ahead of the writer with --jobs
+PREFETCH_WINDOW = 64
+
+UNREADABLE_MARKER = "[Binary or unreadable file: skipped]\n"
+
 
 def load_gitignore(root_path):
-    """Loads patterns from .gitignore in the root directory."""
+    """Loads and compiles patterns from .gitignore in the root directory."""
     patterns = []
     gitignore_path = os.path.join(root_path, '.gitignore')
     if os.path.isfile(gitignore_path):
@@ -30,78 +65,323 @@ def load_gitignore(root_path):
                 if not line or line.startswith('#'):
                     continue
                 patterns.append(line)
-    patterns.append('.git/')  # always ignore .git
-    return patterns
-
-
-def should_skip_tree(name, rel_path, patterns, include_hidden):
-    """Skip hidden, gitignored, or media files/directories when building the tree."""
-    # Hidden
-    if not include_hidden and name.startswith('.'):
-        return True
-    # Gitignore
-    if any(fnmatch.fnmatch(rel_path, pat) for pat in patterns):
-        return True
-    # Media files
-    ext = os.path.splitext(name)[1].lower().lstrip('.')
-    if ext in MEDIA_EXTENSIONS:
-        return True
-    return False
-
-
-def should_skip_content(name, rel_path, ignore_exts, include_pats, exclude_pats):
-    """Skip files when reading contents based on ext-ignores and include/exclude patterns."""
-    ext = os.path.splitext(name)[1].lower().lstrip('.')
-    # Ignored extensions
-    if ext in ignore_exts:
-        return True
-    # Include patterns
-    if include_pats and not any(fnmatch.fnmatch(rel_path, pat) for pat in include_pats):
-        return True
-    # Exclude patterns
-    if exclude_pats and any(fnmatch.fnmatch(rel_path, pat) for pat in exclude_pats):
-        return True
-    return False
-
-
-def scan(root_path, patterns, include_hidden, ignore_exts, include_pats, exclude_pats, max_depth):
-    """Scans directory and returns a tree and contents dict."""
-    contents = {}
-
-    def _scan(current_path, rel_base, depth):
-        if max_depth is not None and depth > max_depth:
-            return []
-        entries = []
-        try:
-            names = sorted(os.listdir(current_path))
-        except PermissionError:
-            return entries
-        for name in names:
-            full = os.path.join(current_path, name)
-            rel = os.path.join(rel_base, name) if rel_base else name
-            is_dir = os.path.isdir(full)
-            # Skip for tree building
-            if should_skip_tree(name, rel, patterns, include_hidden):
-                continue
-            if is_dir:
-                children = _scan(full, rel, depth + 1)
-                entries.append({'type': 'dir', 'name': name, 'children': children})
+    return compile_patterns(patterns)
+
+
+def compile_globs(patterns):
+    """Compiles glob patterns into one regex match function, or None if there are none."""
+    if not patterns:
+        return None
+    return re.compile('|'.join(fnmatch.translate(pat) for pat in patterns)).match
+
+
+def compile_patterns(patterns):
+    """Compiles gitignore patterns into lookup sets, directory prefixes and combined regexes.
+
+    As in git, patterns without a leading or inner '/' (e.g. 'build/',
+    'Cargo.*') match an entry's name at any depth; literal ones become set
+    lookups. Patterns with a '/' before the end are anchored to the root.
+    """
+    exts = set()
+    names = set()
+    name_globs = []
+    dir_names = set(ALWAYS_IGNORED_DIRS)
+    dir_name_globs = []
+    dir_prefixes = []
+    dir_globs = []
+    globs = []
+    for pat in patterns:
+        simple = SIMPLE_EXT_PATTERN.fullmatch(pat)
+        if simple:
+            exts.add(simple.group(1))
+            continue
+        is_dir_pat = pat.endswith('/')
+        body = pat.rstrip('/')
+        is_glob = any(c in body for c in '*?[')
+        if '/' not in body:
+            if is_glob:
+                (dir_name_globs if is_dir_pat else name_globs).append(body)
             else:
-                entries.append({'type': 'file', 'name': name, 'path': rel})
-                # Only read content if not excluded
-                if not should_skip_content(name, rel, ignore_exts, include_pats, exclude_pats):
-                    try:
-                        with open(full, 'r', encoding='utf-8') as f:
-                            contents[rel] = f.read()
-                    except Exception:
-                        contents[rel] = None
-        return entries
+                (dir_names if is_dir_pat else names).add(body)
+            continue
+        pat = pat.lstrip('/')  # anchored patterns are matched from the root
+        if not is_dir_pat:
+            globs.append(pat)
+        elif is_glob:
+            dir_globs.append(pat)
+        else:
+            dir_prefixes.append(pat)
+    return IgnoreRules(exts, names, compile_globs(name_globs),
+                       dir_names, compile_globs(dir_name_globs), tuple(dir_prefixes),
+                       compile_globs(dir_globs), compile_globs(globs))
+
+
+def is_ignored(name, rel_path, is_dir, rules):
+    """Checks an entry against the gitignore rules that depend on its path or type.
+
+    Rules for files and directories alike that only depend on the name
+    (extensions, names, name globs) are applied once per distinct name by
+    make_filter instead.
+    """
+    # Patterns ending in '/' only apply to directories, matched in 'dir/' form
+    if is_dir:
+        if name in rules.dir_names:
+            return True
+        if rules.dir_name_match is not None and rules.dir_name_match(name) is not None:
+            return True
+        marker = rel_path + '/'
+        if marker.startswith(rules.dir_prefixes):
+            return True
+        if rules.dir_match is not None and rules.dir_match(marker) is not None:
+            return True
+    return rules.match is not None and rules.match(rel_path) is not None
+
+
+def _ext(name):
+    """Returns (suffix, ext) for a name from a single rfind.
+
+    suffix is the text after the last dot, as-is, for gitignore's '*.ext'
+    (which also matches a file named '.ext'). ext is lowercased and, like
+    os.path.splitext, empty when only leading dots precede it ('.png').
+    """
+    dot = name.rfind('.')
+    if dot < 0:
+        return '', ''
+    suffix = name[dot + 1:]
+    return suffix, suffix.lower() if name[:dot].strip('.') else ''
+
+
+# Results of the per-entry filter besides None (export fully)
+SKIP_TREE = 'tree'        # leave the entry out of the tree entirely
+SKIP_CONTENT = 'content'  # list the file, but don't export its contents
+
+
+def make_filter(rules, include_hidden, ignore_exts, include_match, exclude_match):
+    """Builds the filter for one run, deciding once per entry whether it is skipped."""
+    @functools.lru_cache(maxsize=8192)
+    def classify_name(name):
+        """Returns (skip_tree, skip_content) for the checks that only depend on the name."""
+        suffix, ext = _ext(name)
+        # Hidden, media, or gitignored by extension (case-sensitive, like fnmatch) or name
+        skip_tree = ((not include_hidden and name.startswith('.')) or ext in MEDIA_EXTENSIONS
+                     or suffix in rules.exts or name in rules.names
+                     or (rules.name_match is not None and rules.name_match(name) is not None))
+        return skip_tree, ext in ignore_exts
+
+    def skip_reason(name, rel_path, is_dir):
+        """Returns None, SKIP_TREE or SKIP_CONTENT for an entry.
+
+        Called on directories before descending, so SKIP_TREE prunes the whole subtree.
+        """
+        skip_tree, ignored_ext = classify_name(name)
+        if skip_tree or is_ignored(name, rel_path, is_dir, rules):
+            return SKIP_TREE
+        if is_dir:
+            return None
+        # Ignored extensions and include/exclude patterns only affect contents
+        if (ignored_ext
+                or (include_match is not None and include_match(rel_path) is None)
+                or (exclude_match is not None and exclude_match(rel_path) is not None)):
+            return SKIP_CONTENT
+        return None
+
+    return skip_reason
+
+
+def list_dir(path):
+    """Lists a directory, returning its entries in readdir order."""
+    try:
+        # scandir yields the entry type from readdir, so no extra stat per entry
+        with os.scandir(path) as it:
+            return list(it)
+    except PermissionError:
+        return []
+
 
-    tree = _scan(root_path, '', 0)
-    return tree, contents
+def _read_small(fd):
+    """Reads a file below SMALL_FILE_SIZE with one os.read, bypassing the io stack.
 
+    Returns None for larger files, with fd rewound for the caller to read.
+    Raises ValueError for binary files, detected by a NUL byte (in the first
+    BINARY_SNIFF_SIZE bytes of large files) before anything is decoded.
+    Newlines are translated like text-mode open().
+    """
+    if os.fstat(fd).st_size >= SMALL_FILE_SIZE:
+        if b'\x00' in os.read(fd, BINARY_SNIFF_SIZE):
+            raise ValueError('binary file')
+        os.lseek(fd, 0, os.SEEK_SET)
+        return None
+    data = os.read(fd, SMALL_FILE_SIZE)
+    if b'\x00' in data:
+        raise ValueError('binary file')
+    text = data.decode('utf-8')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
 
-def render_text(tree, contents, out):
+
+def read_file(path):
+    """Reads a UTF-8 text file, returning None if it is binary or unreadable."""
+    try:
+        fd = os.open(path, READ_FLAGS)
+    except OSError:
+        return None
+    try:
+        text = _read_small(fd)
+        if text is None:
+            with open(fd, 'r', encoding='utf-8', closefd=False) as f:
+                text = f.read()
+        return text
+    except Exception:
+        return None
+    finally:
+        os.close(fd)
+
+
+def read_contents(files, jobs=1):
+    """Reads every file into a dict keyed by relative path, using a thread pool when jobs > 1."""
+    if jobs > 1:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            return dict(zip(files, pool.map(read_file, files.values())))
+    return {rel: read_file(path) for rel, path in files.items()}
+
+
+def load_small_file(path):
+    """Returns a small file's text, the unreadable marker, or None if the file is large."""
+    try:
+        fd = os.open(path, READ_FLAGS)
+    except OSError:
+        return UNREADABLE_MARKER
+    try:
+        return _read_small(fd)
+    except Exception:
+        return UNREADABLE_MARKER
+    finally:
+        os.close(fd)
+
+
+def prefetch_files(files, jobs=1):
+    """Yields (rel, path, text) in order, reading small files ahead on a thread pool.
+
+    text is None for files the caller should stream with copy_file: large
+    files, and every file when jobs <= 1. At most PREFETCH_WINDOW reads are
+    in flight, which bounds memory.
+    """
+    if jobs <= 1:
+        for rel, path in files.items():
+            yield rel, path, None
+        return
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        pending = deque()
+        for rel, path in files.items():
+            pending.append((rel, path, pool.submit(load_small_file, path)))
+            if len(pending) >= PREFETCH_WINDOW:
+                rel, path, future = pending.popleft()
+                yield rel, path, future.result()
+        while pending:
+            rel, path, future = pending.popleft()
+            yield rel, path, future.result()
+
+
+def copy_file(path, out):
+    """Writes a UTF-8 text file into out; large files are streamed with a fixed-size buffer.
+
+    Writes the unreadable marker if the file can't be opened or decoded. If
+    a large file fails to decode part-way through, the text already written
+    is kept and the marker follows on its own line.
+    """
+    try:
+        fd = os.open(path, READ_FLAGS)
+    except OSError:
+        out.write(UNREADABLE_MARKER)
+        return
+    written = False
+    try:
+        text = _read_small(fd)
+        if text is None:
+            with open(fd, 'r', encoding='utf-8', buffering=COPY_BUFSIZE, closefd=False) as f:
+                # copyfileobj-style loop that notes whether anything was written
+                while chunk := f.read(COPY_BUFSIZE):
+                    out.write(chunk)
+                    written = True
+    except Exception:
+        text = '\n' + UNREADABLE_MARKER if written else UNREADABLE_MARKER
+    finally:
+        os.close(fd)
+    if text:
+        out.write(text)
+
+
+def _run_inline(fn, *args):
+    """Runs fn immediately; returns a callable giving its result, like Future.result."""
+    result = fn(*args)
+    return lambda: result
+
+
+def scan(root_path, skip_reason, max_depth, jobs=1, sort=True):
+    """Scans directory and returns a tree and a dict of relative -> full paths to export.
+
+    skip_reason is the per-run filter built by make_filter. With jobs > 1,
+    directory listings run on a thread pool (scandir releases the GIL);
+    otherwise everything runs inline. Entries are sorted by name after
+    filtering, or left in readdir order if sort is False.
+    """
+    tree = []
+    paths = {}
+    pool = ThreadPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    if pool:
+        def submit(fn, *args):
+            return pool.submit(fn, *args).result
+    else:
+        submit = _run_inline
+    try:
+        # Each pending listing knows the children list it fills in and the
+        # 'dir/' prefix of its relative paths; blocking on the oldest one is
+        # fine since the pool keeps working on the rest
+        pending = deque([(submit(list_dir, root_path), tree, '', 0)])
+        while pending:
+            listing, entries, rel_prefix, depth = pending.popleft()
+            for entry in listing():
+                name = entry.name
+                rel = rel_prefix + name
+                # These checks use the d_type cached from readdir and only stat
+                # symlinks, so links to files are exported and links to
+                # directories are listed
+                is_dir = entry.is_dir()
+                if not is_dir and not entry.is_file():
+                    continue  # FIFOs, sockets, devices and dangling links
+                reason = skip_reason(name, rel, is_dir)
+                if reason is SKIP_TREE:
+                    continue
+                if is_dir:
+                    children = []
+                    entries.append({'type': 'dir', 'name': name, 'children': children})
+                    # Symlinked directories stay empty, so link cycles can't recurse
+                    if (max_depth is None or depth < max_depth) and not entry.is_symlink():
+                        pending.append((submit(list_dir, entry.path), children, rel + '/', depth + 1))
+                else:
+                    entries.append({'type': 'file', 'name': name, 'path': rel})
+                    if reason is None:
+                        paths[rel] = entry.path
+            if sort:
+                entries.sort(key=itemgetter('name'))
+    finally:
+        if pool:
+            pool.shutdown()
+
+    # Listings finish out of order, so collect files in tree order
+    def _files(entries):
+        for e in entries:
+            if e['type'] == 'dir':
+                yield from _files(e['children'])
+            elif e['path'] in paths:
+                yield e['path']
+
+    files = {rel: paths[rel] for rel in _files(tree)}
+    return tree, files
+
+
+def render_text(tree, files, out, jobs=1):
     """Renders in plain text format."""
     def _print_tree(entries, indent):
         for e in entries:
@@ -113,16 +393,16 @@ def render_text(tree, contents, out):
     out.write("Directory structure:\n")
     _print_tree(tree, '')
     out.write("\nFile contents:\n")
-    for path, content in contents.items():
-        out.write(f"\n=== {path} ===\n```")
-        if content is not None:
-            out.write(content)
+    for rel, path, text in prefetch_files(files, jobs):
+        out.write(f"\n=== {rel} ===\n```")
+        if text is None:
+            copy_file(path, out)
         else:
-            out.write("[Binary or unreadable file: skipped]\n")
+            out.write(text)
         out.write("```\n")
 
 
-def render_markdown(tree, contents, out):
+def render_markdown(tree, files, out, jobs=1):
     """Renders in GitHub-flavored Markdown."""
     def _md_tree(entries, indent):
         for e in entries:
@@ -134,15 +414,35 @@ def render_markdown(tree, contents, out):
     out.write("## Directory structure\n")
     _md_tree(tree, '')
     out.write("\n## File contents\n")
-    for path, content in contents.items():
-        out.write(f"#### {path}\n```")
-        if content is not None:
-            out.write(content)
+    for rel, path, text in prefetch_files(files, jobs):
+        out.write(f"#### {rel}\n```")
+        if text is None:
+            copy_file(path, out)
         else:
-            out.write("[Binary or unreadable file: skipped]\n")
+            out.write(text)
         out.write("```\n")
 
 
+def render_json(tree, files, out, jobs=1):
+    """Renders JSON, writing each file's content as it is read.
+
+    Output matches json.dump(..., indent=2) of the full document, but only
+    one file's content is held in memory at a time.
+    """
+    # JSON strings never contain raw newlines, so re-indenting is safe
+    structure = json.dumps(tree, indent=2).replace('\n', '\n  ')
+    out.write('{\n  "structure": ' + structure + ',\n  "contents": {')
+    sep = '\n    '
+    for rel, path, text in prefetch_files(files, jobs):
+        if text is None:
+            text = read_file(path)
+        elif text is UNREADABLE_MARKER:  # identity: the sentinel, not file text
+            text = None
+        out.write(sep + json.dumps(rel) + ': ' + json.dumps(text))
+        sep = ',\n    '
+    out.write('}\n}' if sep == '\n    ' else '\n  }\n}')
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Export directory structure and file contents with flexible filtering and output formats.")
@@ -158,6 +458,10 @@ def main():
                         help='Glob patterns to exclude files, e.g. "tests/*"')
     parser.add_argument('--max-depth', type=int, default=None,
                         help='Maximum directory depth (0 = root only)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Number of threads for directory scanning and file reads (1 = sequential)')
+    parser.add_argument('--no-sort', action='store_true', default=False,
+                        help='Keep entries in filesystem order instead of sorting by name')
     parser.add_argument('-f', '--format', choices=['text', 'json', 'yaml', 'markdown'],
                         default='text', help='Output format')
     args = parser.parse_args()
@@ -166,33 +470,35 @@ def main():
         print(f"Error: Path '{args.root}' does not exist or is not a directory.", file=sys.stderr)
         sys.exit(1)
 
-    patterns = load_gitignore(args.root)
+    rules = load_gitignore(args.root)
     ignore_exts = set(ext.lower() for ext in args.ignore_ext)
-    include_pats = args.include
-    exclude_pats = args.exclude
-
-    tree, contents = scan(
-        args.root, patterns, args.hidden,
-        ignore_exts, include_pats, exclude_pats,
-        args.max_depth
+    skip_reason = make_filter(
+        rules, args.hidden, ignore_exts,
+        compile_globs(args.include), compile_globs(args.exclude)
     )
 
-    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    tree, files = scan(args.root, skip_reason, args.max_depth, args.jobs, not args.no_sort)
+
+    # Large write buffer, also for stdout (which is line-buffered on a TTY)
+    if args.output:
+        out = open(args.output, 'w', encoding='utf-8', buffering=COPY_BUFSIZE)
+    else:
+        out = open(sys.stdout.fileno(), 'w', encoding='utf-8', buffering=COPY_BUFSIZE, closefd=False)
 
     if args.format == 'text':
-        render_text(tree, contents, out)
+        render_text(tree, files, out, args.jobs)
     elif args.format == 'markdown':
-        render_markdown(tree, contents, out)
+        render_markdown(tree, files, out, args.jobs)
     elif args.format == 'json':
-        json.dump({'structure': tree, 'contents': contents}, out, indent=2)
+        render_json(tree, files, out, args.jobs)
     elif args.format == 'yaml':
         if not YAML_AVAILABLE:
             print("Error: PyYAML not installed; YAML format unavailable.", file=sys.stderr)
             sys.exit(1)
+        contents = read_contents(files, args.jobs)
         yaml.dump({'structure': tree, 'contents': contents}, out)
 
-    if args.output:
-        out.close()
+    out.close()
 
 if __name__ == '__main__':
     main()
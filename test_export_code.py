@@ -0,0 +1,60 @@
+import unittest
+
+from export_code import SKIP_TREE, compile_patterns, is_ignored, make_filter
+
+
+class GitignoreTest(unittest.TestCase):
+    """Checks compiled .gitignore patterns against git's matching rules."""
+
+    def setUp(self):
+        self.rules = compile_patterns([
+            'build/', 'dist*/', 'Cargo.lock', 'Cargo.*', '*.log',
+            '/top.txt', '/out/', 'docs/*.tmp', 'src/gen*/',
+        ])
+        self.skip = make_filter(self.rules, True, set(), None, None)
+
+    def ignored(self, rel_path, is_dir=False):
+        name = rel_path.rsplit('/', 1)[-1]
+        return self.skip(name, rel_path, is_dir) is SKIP_TREE
+
+    def test_unanchored_patterns_match_at_any_depth(self):
+        for rel_path in ('Cargo.lock', 'src/Cargo.lock', 'src/Cargo.toml', 'a/b/x.log'):
+            self.assertTrue(self.ignored(rel_path), rel_path)
+        self.assertFalse(self.ignored('src/Cargo'))
+
+    def test_anchored_patterns_match_from_root(self):
+        self.assertTrue(self.ignored('top.txt'))
+        self.assertFalse(self.ignored('src/top.txt'))
+        self.assertTrue(self.ignored('out', is_dir=True))
+        self.assertFalse(self.ignored('src/out', is_dir=True))
+        self.assertTrue(self.ignored('docs/a.tmp'))
+        self.assertFalse(self.ignored('src/docs/a.tmp'))
+
+    def test_directory_patterns_only_match_directories(self):
+        self.assertTrue(self.ignored('build', is_dir=True))
+        self.assertTrue(self.ignored('src/build', is_dir=True))
+        self.assertFalse(self.ignored('src/build'))
+        self.assertTrue(self.ignored('.git', is_dir=True))
+
+    def test_wildcard_directory_patterns(self):
+        self.assertTrue(self.ignored('dist2', is_dir=True))
+        self.assertTrue(self.ignored('src/dist2', is_dir=True))
+        self.assertFalse(self.ignored('src/dist2'))
+        self.assertTrue(self.ignored('src/generated', is_dir=True))
+        self.assertFalse(self.ignored('lib/src/generated', is_dir=True))
+
+    def test_leading_dot_is_not_an_extension(self):
+        skip = make_filter(compile_patterns(['*.env']), True, {'gitignore'}, None, None)
+        self.assertIsNone(skip('.png', '.png', False))
+        self.assertIsNone(skip('.gitignore', '.gitignore', False))
+        self.assertIs(skip('a.png', 'a.png', False), SKIP_TREE)
+        self.assertIs(skip('.env', '.env', False), SKIP_TREE)
+
+    def test_is_ignored_covers_path_and_type_rules(self):
+        self.assertTrue(is_ignored('build', 'src/build', True, self.rules))
+        self.assertTrue(is_ignored('top.txt', 'top.txt', False, self.rules))
+        self.assertFalse(is_ignored('main.py', 'src/main.py', False, self.rules))
+
+
+if __name__ == '__main__':
+    unittest.main()